@@ -16,10 +16,9 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.types import JSON
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Logging output is configured by the caller (see main() for the CLI)
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
 # Get the absolute path of the directory
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -41,10 +40,18 @@ def backup_database():
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backup_path = os.path.join(db_backup_dir, f'app_db_backup_{timestamp}.db')
     
-    # Copy the database file
+    # Use SQLite's online backup API: with WAL enabled, committed data may
+    # still be in app.db-wal, so copying app.db alone would miss it
     try:
-        import shutil
-        shutil.copy2(db_path, backup_path)
+        source = sqlite3.connect(db_path)
+        try:
+            target = sqlite3.connect(backup_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
         logger.info(f"Database backed up to {backup_path}")
     except Exception as e:
         logger.error(f"Failed to backup database: {e}")
@@ -53,8 +60,8 @@ def backup_database():
 def create_database():
     """Create a new database with all tables"""
     try:
-        # Import models from server.py
-        from server import app, db, Photo, PhotoFrame, PlaylistEntry, ScheduledGeneration, GenerationHistory, SyncGroup
+        # Importing server registers all models on db.metadata
+        from server import app, db
         
         # Create all tables within application context
         with app.app_context():
@@ -64,7 +71,8 @@ def create_database():
             # Verify tables were created
             engine = create_engine(f'sqlite:///{db_path}')
             tables = inspect(engine).get_table_names()
-            logger.info(f"Created tables: {', '.join(tables)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Created tables: {', '.join(tables)}")
             
             logger.info("Database creation complete!")
             return True
@@ -72,31 +80,28 @@ def create_database():
         logger.error(f"Error creating database: {e}")
         return False
 
+# SQLAlchemy type -> SQLite type string, built once
+_TYPE_MAP = {
+    Integer: lambda c: "INTEGER",
+    String: lambda c: f"VARCHAR({getattr(c.type, 'length', None) or 255})",
+    Text: lambda c: "TEXT",
+    Float: lambda c: "FLOAT",
+    Boolean: lambda c: "BOOLEAN",
+    DateTime: lambda c: "DATETIME",
+    JSON: lambda c: "JSON",
+}
+
 def get_column_type_sql(column):
     """Convert SQLAlchemy column type to SQLite type string"""
-    from sqlalchemy import Integer, String, Float, Boolean, DateTime, Text
-    from sqlalchemy.types import JSON
-    
     col_type = type(column.type)
-    
-    if col_type == Integer:
-        return "INTEGER"
-    elif col_type == String:
-        length = getattr(column.type, 'length', None)
-        return f"VARCHAR({length})" if length else "VARCHAR(255)"
-    elif col_type == Text:
-        return "TEXT"
-    elif col_type == Float:
-        return "FLOAT"
-    elif col_type == Boolean:
-        return "BOOLEAN"
-    elif col_type == DateTime:
-        return "DATETIME"
-    elif col_type == JSON or col_type.__name__ == 'JSON':
+    converter = _TYPE_MAP.get(col_type)
+    if converter is not None:
+        return converter(column)
+    # Dialect-specific JSON subclasses
+    if col_type.__name__ == 'JSON':
         return "JSON"
-    else:
-        # Default to TEXT for unknown types
-        return "TEXT"
+    # Default to TEXT for unknown types
+    return "TEXT"
 
 def get_column_default_sql(column):
     """Get the default value clause for a column"""
@@ -110,11 +115,96 @@ def get_column_default_sql(column):
             return f"DEFAULT '{default_value}'"
     return ""
 
+def add_missing_columns(engine, alter_statements):
+    """
+    Apply (table_name, col_name, sql) ALTER TABLE statements.
+    
+    On SQLite all statements are sent as one script inside a single
+    transaction. If the script fails it is rolled back as a whole and the
+    statements are retried one at a time so the failing ones can be skipped.
+    """
+    if engine.dialect.name == 'sqlite':
+        ddl_script = ";\n".join(sql for _, _, sql in alter_statements) + ";"
+        raw = engine.raw_connection()
+        try:
+            sqlite_conn = raw.driver_connection
+            try:
+                sqlite_conn.executescript("BEGIN;\n" + ddl_script + "\nCOMMIT;")
+                for table_name, col_name, _ in alter_statements:
+                    logger.info(f"  Added column '{col_name}' to table '{table_name}'")
+                return
+            except sqlite3.Error as e:
+                if sqlite_conn.in_transaction:
+                    sqlite_conn.rollback()
+                logger.warning(f"Batched column migration failed ({e}), adding columns one at a time")
+        finally:
+            raw.close()
+    
+    # Add each missing column in its own transaction, so one failing
+    # statement doesn't take the others with it
+    for table_name, col_name, sql in alter_statements:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(sql))
+            logger.info(f"  Added column '{col_name}' to table '{table_name}'")
+        except Exception as e:
+            # Column might already exist (race condition) or other issue
+            logger.warning(f"  Could not add column '{col_name}': {e}")
+
+def migrate_frame_flags(engine, existing_columns, frame_flags):
+    """
+    Fold the old per-setting boolean columns of photo_frame into the packed
+    flags column.
+    
+    Adding the column and copying the values happen in one transaction, so
+    the copy can only ever run once. The old columns are then dropped where
+    the database allows it; otherwise they are left behind unused.
+    Returns True if the flags column was added.
+    """
+    legacy = [(name, bit) for name, bit in frame_flags.items() if name in existing_columns]
+    if 'flags' in existing_columns or not legacy:
+        return False
+    
+    quote = engine.dialect.identifier_preparer.quote
+    statements = [
+        f"ALTER TABLE {quote('photo_frame')} ADD COLUMN {quote('flags')} INTEGER DEFAULT 0",
+        "UPDATE {} SET {} = {}".format(
+            quote('photo_frame'), quote('flags'),
+            " | ".join(f"(CASE WHEN {quote(name)} THEN {bit} ELSE 0 END)" for name, bit in legacy)
+        ),
+    ]
+    if engine.dialect.name == 'sqlite':
+        # pysqlite doesn't open a transaction for DDL, so run the pair as one script
+        raw = engine.raw_connection()
+        try:
+            sqlite_conn = raw.driver_connection
+            try:
+                sqlite_conn.executescript("BEGIN;\n" + ";\n".join(statements) + ";\nCOMMIT;")
+            except sqlite3.Error:
+                if sqlite_conn.in_transaction:
+                    sqlite_conn.rollback()
+                raise
+        finally:
+            raw.close()
+    else:
+        with engine.begin() as conn:
+            for sql in statements:
+                conn.execute(text(sql))
+    logger.info(f"  Moved {', '.join(name for name, _ in legacy)} into photo_frame.flags")
+    
+    for name, _ in legacy:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {quote('photo_frame')} DROP COLUMN {quote(name)}"))
+        except Exception as e:
+            logger.warning(f"  Could not drop old column '{name}' (left unused): {e}")
+    return True
+
 def migrate_database():
     """Migrate the database schema to match the current models"""
     try:
-        # Import models from server.py
-        from server import app, db, Photo, PhotoFrame, PlaylistEntry, ScheduledGeneration, GenerationHistory, SyncGroup
+        # Importing server registers all models on db.metadata
+        from server import app, db
         
         # Get the engine and inspector within application context
         with app.app_context():
@@ -124,7 +214,8 @@ def migrate_database():
             
             # Get existing tables
             existing_tables = inspector.get_table_names()
-            logger.info(f"Existing tables: {', '.join(existing_tables)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Existing tables: {', '.join(existing_tables)}")
             
             # Get metadata from models
             metadata = db.metadata
@@ -132,40 +223,79 @@ def migrate_database():
             # Create missing tables
             missing_tables = set(metadata.tables.keys()) - set(existing_tables)
             if missing_tables:
-                logger.info(f"Creating missing tables: {', '.join(missing_tables)}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Creating missing tables: {', '.join(missing_tables)}")
                 for table_name in missing_tables:
                     metadata.tables[table_name].create(engine)
             
-            # Check for missing columns in existing tables and add them
-            for table_name in existing_tables:
-                if table_name in metadata.tables:
-                    # Get existing columns
-                    existing_columns = {col['name'] for col in inspector.get_columns(table_name)}
-                    
-                    # Get model columns as a dict for easy access
-                    model_table = metadata.tables[table_name]
-                    model_columns = {col.name: col for col in model_table.columns}
-                    
-                    # Find missing columns
-                    missing_column_names = set(model_columns.keys()) - existing_columns
-                    if missing_column_names:
+            tables_to_check = [t for t in existing_tables if t in metadata.tables]
+            if engine.dialect.name == 'sqlite':
+                # Only column names are needed, so read PRAGMA table_info
+                # directly instead of going through SQLAlchemy reflection
+                existing_columns_by_table = {}
+                raw = engine.raw_connection()
+                try:
+                    cur = raw.cursor()
+                    for table_name in tables_to_check:
+                        cur.execute(f"PRAGMA table_info({engine.dialect.identifier_preparer.quote(table_name)})")
+                        existing_columns_by_table[table_name] = {row[1] for row in cur.fetchall()}
+                    cur.close()
+                finally:
+                    raw.close()
+            else:
+                # Reflect columns of all existing tables in one batched call
+                try:
+                    reflected = inspector.get_multi_columns(filter_names=tables_to_check)
+                    existing_columns_by_table = {
+                        table_name: {col['name'] for col in cols}
+                        for (_, table_name), cols in reflected.items()
+                    }
+                except (AttributeError, NotImplementedError):
+                    # Older SQLAlchemy without batched reflection
+                    existing_columns_by_table = {
+                        table_name: {col['name'] for col in inspector.get_columns(table_name)}
+                        for table_name in tables_to_check
+                    }
+            
+            # Boolean settings moved into photo_frame.flags need their data carried over
+            if 'photo_frame' in existing_columns_by_table:
+                from model import FRAME_FLAGS
+                if migrate_frame_flags(engine, existing_columns_by_table['photo_frame'], FRAME_FLAGS):
+                    existing_columns_by_table['photo_frame'].add('flags')
+            
+            # Check for missing columns in existing tables
+            quote = engine.dialect.identifier_preparer.quote
+            alter_statements = []
+            for table_name in tables_to_check:
+                # Get existing columns
+                existing_columns = existing_columns_by_table.get(table_name, set())
+                
+                # Get model columns as a dict for easy access
+                model_table = metadata.tables[table_name]
+                model_columns = {col.name: col for col in model_table.columns}
+                
+                # Find missing columns
+                missing_column_names = set(model_columns.keys()) - existing_columns
+                if missing_column_names:
+                    if logger.isEnabledFor(logging.INFO):
                         logger.info(f"Table '{table_name}' is missing columns: {', '.join(missing_column_names)}")
+                    
+                    for col_name in missing_column_names:
+                        column = model_columns[col_name]
+                        col_type = get_column_type_sql(column)
+                        col_default = get_column_default_sql(column)
                         
-                        # Add each missing column
-                        with engine.connect() as conn:
-                            for col_name in missing_column_names:
-                                column = model_columns[col_name]
-                                col_type = get_column_type_sql(column)
-                                col_default = get_column_default_sql(column)
-                                
-                                sql = f"ALTER TABLE {table_name} ADD COLUMN {col_name} {col_type} {col_default}".strip()
-                                try:
-                                    conn.execute(text(sql))
-                                    conn.commit()
-                                    logger.info(f"  Added column '{col_name}' to table '{table_name}'")
-                                except Exception as e:
-                                    # Column might already exist (race condition) or other issue
-                                    logger.warning(f"  Could not add column '{col_name}': {e}")
+                        sql = f"ALTER TABLE {quote(table_name)} ADD COLUMN {quote(col_name)} {col_type} {col_default}".strip()
+                        alter_statements.append((table_name, col_name, sql))
+            
+            if alter_statements:
+                add_missing_columns(engine, alter_statements)
+            
+            # Create missing indexes on existing tables, now that any indexed
+            # columns they need have been added
+            for table_name in tables_to_check:
+                for index in metadata.tables[table_name].indexes:
+                    index.create(engine, checkfirst=True)
             
             logger.info("Database migration complete!")
             return True
@@ -219,4 +349,6 @@ def main():
     return 0
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, 
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     sys.exit(main()) 
\ No newline at end of file
@@ -1,6 +1,109 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+import warnings
 from datetime import datetime
+from flask import current_app
+from sqlalchemy import tuple_
 from model import db, EventLog
 
+logger = logging.getLogger(__name__)
+
+# Events are queued and written by a background thread in batches
+_BATCH_SIZE = 500
+_BATCH_WAIT = 0.1  # Longest a batch waits for more events after its first one
+_STOP = object()  # Queued by flush_events to make the writer finish and exit
+_queue = queue.Queue(maxsize=10000)
+_writer_lock = threading.Lock()
+_writer_thread = None
+_app = None
+
+def _write_events(rows):
+    """Insert a batch of event rows in a single transaction"""
+    db.session.execute(EventLog.__table__.insert(), rows)
+    db.session.commit()
+
+def _write_batch(rows):
+    """
+    Write a batch of queued events. If the batch fails, retry its rows one at
+    a time so only the rows that fail on their own are dropped (and logged).
+    """
+    try:
+        _write_events(rows)
+        return
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Failed to write {len(rows)} events ({e}), retrying one at a time")
+    for row in rows:
+        try:
+            _write_events([row])
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Dropping {row['event_type']} event for frame {row['frame_id']}: {e}")
+
+def _drain(block=True):
+    """
+    Collect up to a batch of queued events. If block is set, wait for the
+    first one and then at most _BATCH_WAIT in total for the rest.
+    """
+    rows = []
+    try:
+        if not block:
+            while len(rows) < _BATCH_SIZE:
+                rows.append(_queue.get_nowait())
+            return rows
+        rows.append(_queue.get())
+        deadline = time.monotonic() + _BATCH_WAIT
+        while len(rows) < _BATCH_SIZE and rows[-1] is not _STOP:
+            rows.append(_queue.get(timeout=max(0, deadline - time.monotonic())))
+    except queue.Empty:
+        pass
+    return rows
+
+def _writer_loop():
+    """Background thread: commit queued events in batches until told to stop"""
+    while True:
+        rows = _drain()
+        stop = rows[-1] is _STOP
+        if stop:
+            rows.pop()
+        if rows:
+            with _app.app_context():
+                _write_batch(rows)
+        if stop:
+            return
+
+def _start_writer():
+    """Start the background writer thread on first use"""
+    global _writer_thread, _app
+    with _writer_lock:
+        if _writer_thread is None:
+            _app = current_app._get_current_object()
+            _writer_thread = threading.Thread(target=_writer_loop, name='event-logger', daemon=True)
+            _writer_thread.start()
+
+def flush_events():
+    """
+    Write all queued events before returning. The writer thread finishes its
+    current batch and exits first, so no drained batch is left uncommitted;
+    the next logged event starts a new one.
+    """
+    global _writer_thread
+    if _app is None:
+        return
+    with _writer_lock:
+        if _writer_thread is not None:
+            _queue.put(_STOP)
+            _writer_thread.join()
+            _writer_thread = None
+        with _app.app_context():
+            while rows := _drain(block=False):
+                _write_batch(rows)
+
+atexit.register(flush_events)
+
 class EventLogger:
     # Event type constants
     EVENT_CONNECTION = 'connection'
@@ -25,16 +128,26 @@ class EventLogger:
             event_type: Type of event (use class constants)
             source: Source of the event (user, mqtt, system, frame)
             details: Dict containing additional event information
+        
+        Events are written asynchronously in batches; use flush_events()
+        when they must be visible immediately.
         """
-        details = details or {}
-        event = EventLog(
+        row = dict(
             frame_id=frame_id,
             event_type=event_type,
             source=source,
-            details=details
+            details=details or {},
+            timestamp=datetime.utcnow()
         )
-        db.session.add(event)
-        db.session.commit()
+        
+        if _writer_thread is None:
+            _start_writer()
+        
+        try:
+            _queue.put_nowait(row)
+        except queue.Full:
+            # Writer is falling behind; write this event synchronously
+            _write_events([row])
     
     @staticmethod
     def log_connection(frame_id, source='frame', details=None):
@@ -70,7 +183,7 @@ class EventLogger:
         EventLogger.log_event(frame_id, EventLogger.EVENT_PLAYLIST_CHANGE, source, details)
     
     @staticmethod
-    def get_events(frame_id=None, event_type=None, limit=100, offset=0):
+    def get_events(frame_id=None, event_type=None, limit=100, offset=None, *, cursor=None):
         """
         Get events, optionally filtered by frame and event type
         
@@ -78,10 +191,12 @@ class EventLogger:
             frame_id: Optional frame ID to filter events
             event_type: Optional event type to filter events
             limit: Maximum number of events to return
-            offset: Offset for pagination
+            offset: Deprecated, use cursor instead
+            cursor: (timestamp, id) of the last event of the previous page,
+                    or None for the first page (keyword only)
             
         Returns:
-            List of EventLog objects
+            List of EventLog objects, newest first
         """
         query = EventLog.query
         
@@ -90,5 +205,16 @@ class EventLogger:
         
         if event_type:
             query = query.filter(EventLog.event_type == event_type)
+        
+        # Seek past the previous page using the (timestamp, id) index
+        if cursor is not None:
+            query = query.filter(tuple_(EventLog.timestamp, EventLog.id) < tuple(cursor))
+        
+        query = query.order_by(EventLog.timestamp.desc(), EventLog.id.desc()).limit(limit)
+        
+        if offset:
+            warnings.warn("get_events(offset=...) is deprecated, pass cursor instead",
+                          DeprecationWarning, stacklevel=2)
+            query = query.offset(offset)
             
-        return query.order_by(EventLog.timestamp.desc()).limit(limit).offset(offset).all()
\ No newline at end of file
+        return query.all()
\ No newline at end of file
@@ -2,8 +2,190 @@ from PIL import Image
 import io
 import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Numba is optional; without it dithering falls back to PIL's quantize()
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Resolve rotation constants once (PIL >= 9.1 moved them to Image.Transpose)
+try:
+    from PIL.Image import Transpose
+    ROTATE_90 = Transpose.ROTATE_90
+    ROTATE_270 = Transpose.ROTATE_270
+except (ImportError, AttributeError):
+    ROTATE_90 = Image.ROTATE_90
+    ROTATE_270 = Image.ROTATE_270
+
+# 7-color e-paper palette: Black, White, Yellow, Red, Black(duplicate), Blue, Green
+PALETTE_7COLOR = ((0, 0, 0), (255, 255, 255), (255, 255, 0), (255, 0, 0),
+                  (0, 0, 0), (0, 0, 255), (0, 255, 0))
+
+# Seeed_GFX 6-color e-paper palette: White, Black, Yellow, Red, Blue, Green
+PALETTE_6COLOR = ((255, 255, 255), (0, 0, 0), (255, 255, 0), (255, 0, 0),
+                  (0, 0, 255), (0, 255, 0))
+
+def _palette_data(palette):
+    """Flatten (r, g, b) tuples into a full 256-entry palette padded with black."""
+    return tuple(c for rgb in palette for c in rgb) + (0, 0, 0) * (256 - len(palette))
+
+def _palette_image(palette):
+    """Build a 1x1 'P' image carrying the palette, for use with Image.quantize()."""
+    pal_image = Image.new('P', (1, 1))
+    pal_image.putpalette(_palette_data(palette))
+    return pal_image
+
+# Flat palette data and palette images, built once. quantize(palette=...) only
+# reads the palette image, so sharing them between calls/threads is safe.
+PALETTE_7COLOR_DATA = _palette_data(PALETTE_7COLOR)
+PAL_IMAGE_7COLOR = _palette_image(PALETTE_7COLOR)
+PAL_IMAGE_6COLOR = _palette_image(PALETTE_6COLOR)
+
+def _pack_nibbles(values, pad):
+    """
+    Pack 4-bit values two per byte (even pixel in the high nibble).
+
+    Writes straight into the returned bytearray through in-place ufuncs, so no
+    temporaries are created beyond the strided input views. An odd trailing
+    value is paired with `pad`.
+    """
+    if values.size % 2:
+        values = np.append(values, np.array([pad], dtype=np.uint8))
+    out = bytearray(values.size // 2)
+    buf = np.frombuffer(out, dtype=np.uint8)
+    np.left_shift(values[0::2], 4, out=buf)
+    np.bitwise_or(buf, values[1::2], out=buf)
+    return out
+
+def _resize_to_fill(image, target_width, target_height):
+    """
+    Resize an image so it covers the target dimensions, keeping its aspect ratio.
+
+    Returns the image unchanged if it already has the target size. For large
+    downscales, reducing_gap lets PIL shrink with a cheap box reduce() before
+    applying the LANCZOS filter.
+    """
+    if image.size == (target_width, target_height):
+        return image
+
+    # Use the LARGER ratio to ensure the image fills the target dimensions
+    # This will result in cropping, but no white bars
+    resize_ratio = max(target_width / image.width, target_height / image.height)
+    new_width = int(image.width * resize_ratio)
+    new_height = int(image.height * resize_ratio)
+
+    return image.resize((new_width, new_height), Image.LANCZOS, reducing_gap=3.0)
+
+def _center_crop(image, target_width, target_height):
+    """Crop an image to the target dimensions around its center if it is larger."""
+    if image.width > target_width or image.height > target_height:
+        left = (image.width - target_width) // 2
+        top = (image.height - target_height) // 2
+        return image.crop((left, top, left + target_width, top + target_height))
+    return image
+
+def _fit_crop(image, target_width, target_height, rotate=None):
+    """
+    Resize an image to FILL the target dimensions, center-cropping any overflow.
+
+    If `rotate` is given (e.g. ROTATE_90), the image is transposed first.
+    """
+    if rotate is not None:
+        image = image.transpose(rotate)
+    if image.size == (target_width, target_height):
+        return image
+    image = _resize_to_fill(image, target_width, target_height)
+    return _center_crop(image, target_width, target_height)
+
+PALETTE_6COLOR_ARR = np.array(PALETTE_6COLOR, dtype=np.int32)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False)
+    def dither_fs(img, palette):
+        """
+        Floyd-Steinberg dither an RGB image to palette indices.
+
+        Args:
+            img: uint8 array of shape (height, width, 3)
+            palette: int32 array of shape (colors, 3)
+
+        Returns:
+            numpy.ndarray: uint8 array of palette indices with shape (height, width)
+        """
+        height, width = img.shape[0], img.shape[1]
+        colors = palette.shape[0]
+        out = np.empty((height, width), dtype=np.uint8)
+
+        # Error accumulators for the current and next row, scaled by 16 and
+        # padded by one pixel on each side so neighbors need no bounds checks
+        cur = np.zeros((width + 2, 3), dtype=np.int32)
+        nxt = np.zeros((width + 2, 3), dtype=np.int32)
+
+        for y in range(height):
+            for x in range(width):
+                r = min(max(img[y, x, 0] + ((cur[x + 1, 0] + 8) >> 4), 0), 255)
+                g = min(max(img[y, x, 1] + ((cur[x + 1, 1] + 8) >> 4), 0), 255)
+                b = min(max(img[y, x, 2] + ((cur[x + 1, 2] + 8) >> 4), 0), 255)
+
+                # Find the nearest palette color by squared distance
+                best = 0
+                best_dist = 1 << 30
+                for i in range(colors):
+                    dr = r - palette[i, 0]
+                    dg = g - palette[i, 1]
+                    db = b - palette[i, 2]
+                    dist = dr * dr + dg * dg + db * db
+                    if dist < best_dist:
+                        best_dist = dist
+                        best = i
+                out[y, x] = best
+
+                # Diffuse the error: 7/16 right, 3/16 below-left, 5/16 below, 1/16 below-right
+                er = r - palette[best, 0]
+                eg = g - palette[best, 1]
+                eb = b - palette[best, 2]
+                cur[x + 2, 0] += er * 7
+                cur[x + 2, 1] += eg * 7
+                cur[x + 2, 2] += eb * 7
+                nxt[x, 0] += er * 3
+                nxt[x, 1] += eg * 3
+                nxt[x, 2] += eb * 3
+                nxt[x + 1, 0] += er * 5
+                nxt[x + 1, 1] += eg * 5
+                nxt[x + 1, 2] += eb * 5
+                nxt[x + 2, 0] += er
+                nxt[x + 2, 1] += eg
+                nxt[x + 2, 2] += eb
+
+            cur, nxt = nxt, cur
+            nxt[:, :] = 0
+
+        return out
+
+    @njit(cache=True)
+    def rgb565_pack(img, swap_bytes, out):
+        """
+        Pack an RGB image into RGB565 in a single pass.
+
+        Args:
+            img: uint8 array of shape (height, width, 3)
+            swap_bytes: If True, swap bytes within each 16-bit pixel
+            out: uint16 array of shape (height, width) to write into
+        """
+        height, width = img.shape[0], img.shape[1]
+        for y in range(height):
+            for x in range(width):
+                value = (((np.uint16(img[y, x, 0]) & 0xF8) << 8) |
+                         ((np.uint16(img[y, x, 1]) & 0xFC) << 3) |
+                         (np.uint16(img[y, x, 2]) >> 3))
+                if swap_bytes:
+                    value = ((value & 0xFF) << 8) | (value >> 8)
+                out[y, x] = value
+
 def img_to_array(image, orientation='portrait'):
     """
     Convert an image to a format suitable for e-paper displays.
@@ -13,82 +195,35 @@ def img_to_array(image, orientation='portrait'):
         orientation: The desired orientation ('portrait' or 'landscape')
         
     Returns:
-        bytes: Raw bytes of the image data in the format expected by the e-paper display
+        bytearray: Raw bytes of the image data in the format expected by the e-paper display
     """
     
     # Ensure image is in RGB mode (not RGBA)
     if image.mode != 'RGB':
         image = image.convert('RGB')
     
-    # For landscape orientation, always rotate 90 degrees
-    if orientation.lower() == 'landscape':
-        try:
-            # For newer versions of PIL
-            from PIL.Image import Transpose
-            image = image.transpose(Transpose.ROTATE_90)
-        except (ImportError, AttributeError):
-            # For older versions of PIL
-            image = image.transpose(Image.ROTATE_90)
-    
     # Target dimensions for the e-paper display
     target_width, target_height = 1200, 1600
     
-    # Resize to FILL the target dimensions (will crop if necessary)
-    if image.size != (target_width, target_height):
-        # Calculate the resize ratio for both dimensions
-        width_ratio = target_width / image.width
-        height_ratio = target_height / image.height
-        
-        # Use the LARGER ratio to ensure the image fills the target dimensions
-        # This will result in cropping, but no white bars
-        resize_ratio = max(width_ratio, height_ratio)
-        
-        # Calculate new dimensions
-        new_width = int(image.width * resize_ratio)
-        new_height = int(image.height * resize_ratio)
-        
-        # Resize the image to fill or exceed the target dimensions
-        image = image.resize((new_width, new_height), Image.LANCZOS)
-        
-        # If the image is now larger than the target, crop it to the center
-        if new_width > target_width or new_height > target_height:
-            # Calculate crop box (centered)
-            left = (new_width - target_width) // 2
-            top = (new_height - target_height) // 2
-            right = left + target_width
-            bottom = top + target_height
-            
-            # Crop the image to the target dimensions
-            image = image.crop((left, top, right, bottom))
-    
-    # Create a palette image with the 7 colors used by the e-paper display
-    pal_image = Image.new('P', (1, 1))
-    # The palette order is: Black, White, Yellow, Red, Black(duplicate), Blue, Green
-    pal_image.putpalette((0,0,0, 255,255,255, 255,255,0, 255,0,0, 0,0,0, 0,0,255, 0,255,0) + (0,0,0)*249)
+    # For landscape orientation, always rotate 90 degrees, then resize to
+    # FILL the target dimensions (will crop if necessary)
+    rotate = ROTATE_90 if orientation.lower() == 'landscape' else None
+    image = _fit_crop(image, target_width, target_height, rotate)
     
     # Convert the source image to the 7 colors, dithering if needed
-    image_7color = image.convert("RGB").quantize(palette=pal_image)
+    # (the mode guard above already guarantees RGB, so no convert copy)
+    assert image.mode == 'RGB'
+    image_7color = image.quantize(palette=PAL_IMAGE_7COLOR)
     
     # Get the raw bytes of the quantized image
-    buf_7color = bytearray(image_7color.tobytes('raw'))
+    buf_7color = np.frombuffer(image_7color.tobytes('raw'), dtype=np.uint8)
     
     # PIL does not support 4 bit color, so pack the 4 bits of color
-    # into a single byte to transfer to the panel
-    buf = bytearray(int(image.width * image.height / 2))
-    idx = 0
-    
-    # Pack two 4-bit color values into each byte
-    for i in range(0, len(buf_7color), 2):
-        if i + 1 < len(buf_7color):
-            buf[idx] = (buf_7color[i] << 4) | buf_7color[i+1]
-        else:
-            # If we have an odd number of pixels, pad with white (1)
-            buf[idx] = (buf_7color[i] << 4) | 1
-        idx += 1
-    
-    return bytes(buf) 
-
-def img_to_rgb565(image, target_width=320, target_height=240, swap_bytes=True):
+    # into a single byte to transfer to the panel. If we have an odd
+    # number of pixels, pad with white (1)
+    return _pack_nibbles(buf_7color, 1)
+
+def img_to_rgb565(image, target_width=320, target_height=240, swap_bytes=True, out=None):
     """
     Convert an image to RGB565 format (16-bit color) for TFT/LCD displays.
     
@@ -104,9 +239,12 @@ def img_to_rgb565(image, target_width=320, target_height=240, swap_bytes=True):
         swap_bytes: If True, swap bytes within each 16-bit pixel (default: True)
                     This is required for TFT_eSPI and most ESP32/Arduino displays.
                     Matches the output of rgb565-converter and LVGL image converter.
+        out: Optional writable buffer of target_width * target_height * 2 bytes
+             to write into (e.g. a reused bytearray). Allocated if not given.
         
     Returns:
-        bytes: Raw bytes of the image data in RGB565 format (2 bytes per pixel)
+        bytearray: Raw bytes of the image data in RGB565 format (2 bytes per pixel),
+                   or `out` if it was provided
     """
     
     # Ensure image is in RGB mode (not RGBA)
@@ -114,34 +252,20 @@ def img_to_rgb565(image, target_width=320, target_height=240, swap_bytes=True):
         image = image.convert('RGB')
     
     # Resize to FILL the target dimensions (will crop if necessary)
-    if image.size != (target_width, target_height):
-        # Calculate the resize ratio for both dimensions
-        width_ratio = target_width / image.width
-        height_ratio = target_height / image.height
-        
-        # Use the LARGER ratio to ensure the image fills the target dimensions
-        resize_ratio = max(width_ratio, height_ratio)
-        
-        # Calculate new dimensions
-        new_width = int(image.width * resize_ratio)
-        new_height = int(image.height * resize_ratio)
-        
-        # Resize the image to fill or exceed the target dimensions
-        image = image.resize((new_width, new_height), Image.LANCZOS)
-        
-        # If the image is now larger than the target, crop it to the center
-        if new_width > target_width or new_height > target_height:
-            # Calculate crop box (centered)
-            left = (new_width - target_width) // 2
-            top = (new_height - target_height) // 2
-            right = left + target_width
-            bottom = top + target_height
-            
-            # Crop the image to the target dimensions
-            image = image.crop((left, top, right, bottom))
+    image = _fit_crop(image, target_width, target_height)
     
     # Convert to numpy array for efficient processing
-    img_array = np.array(image)
+    img_array = np.asarray(image)
+    
+    # Native byte order uint16 view of the output buffer
+    if out is None:
+        out = bytearray(target_width * target_height * 2)
+    out_array = np.frombuffer(out, dtype=np.uint16).reshape(target_height, target_width)
+    
+    if NUMBA_AVAILABLE:
+        # Fused kernel: one read of each pixel, one uint16 write, no temporaries
+        rgb565_pack(img_array, swap_bytes, out_array)
+        return out
     
     # Extract RGB channels using the same formula as rgb565-converter
     # (r & 0xF8) << 8 | (g & 0xFC) << 3 | b >> 3
@@ -157,7 +281,8 @@ def img_to_rgb565(image, target_width=320, target_height=240, swap_bytes=True):
         rgb565 = ((rgb565 & 0xFF) << 8) | ((rgb565 >> 8) & 0xFF)
     
     # Output as native byte order (after swap, this gives correct result)
-    return rgb565.astype(np.uint16).tobytes()
+    out_array[:] = rgb565
+    return out
 
 def img_to_epaper_4bit(image, orientation='portrait'):
     """
@@ -170,86 +295,41 @@ def img_to_epaper_4bit(image, orientation='portrait'):
     - Red: 0x6
     - Blue: 0xD
     - Green: 0x2
+
+    Returns a bytearray with two pixels per byte.
     """
 
     # Ensure image is in RGB mode (not RGBA)
     if image.mode != 'RGB':
         image = image.convert('RGB')
 
-    # For landscape orientation, always rotate 90 degrees
-    if orientation and orientation.lower() == 'landscape':
-        try:
-            # For newer versions of PIL
-            from PIL.Image import Transpose
-            image = image.transpose(Transpose.ROTATE_90)
-        except (ImportError, AttributeError):
-            # For older versions of PIL
-            image = image.transpose(Image.ROTATE_90)
-
     # Target dimensions for the 13.3" e-paper display
     target_width, target_height = 1200, 1600
 
-    # Resize to FILL the target dimensions (will crop if necessary)
-    if image.size != (target_width, target_height):
-        # Calculate the resize ratio for both dimensions
-        width_ratio = target_width / image.width
-        height_ratio = target_height / image.height
-
-        # Use the LARGER ratio to ensure the image fills the target dimensions
-        resize_ratio = max(width_ratio, height_ratio)
-
-        # Calculate new dimensions
-        new_width = int(image.width * resize_ratio)
-        new_height = int(image.height * resize_ratio)
-
-        # Resize the image to fill or exceed the target dimensions
-        image = image.resize((new_width, new_height), Image.LANCZOS)
-
-        # If the image is now larger than the target, crop it to the center
-        if new_width > target_width or new_height > target_height:
-            # Calculate crop box (centered)
-            left = (new_width - target_width) // 2
-            top = (new_height - target_height) // 2
-            right = left + target_width
-            bottom = top + target_height
-
-            # Crop the image to the target dimensions
-            image = image.crop((left, top, right, bottom))
-
-    # Build a palette image with 6 colors in a fixed order
-    # Order: White, Black, Yellow, Red, Blue, Green
-    pal_image = Image.new('P', (1, 1))
-    pal_image.putpalette(
-        (255, 255, 255,   # White
-         0, 0, 0,         # Black
-         255, 255, 0,     # Yellow
-         255, 0, 0,       # Red
-         0, 0, 255,       # Blue
-         0, 255, 0)       # Green
-        + (0, 0, 0) * (256 - 6)
-    )
-
-    # Quantize the image to the palette (dither helps with gradients)
-    indexed = image.convert("RGB").quantize(palette=pal_image, dither=Image.FLOYDSTEINBERG)
+    # For landscape orientation, always rotate 90 degrees, then resize to
+    # FILL the target dimensions (will crop if necessary)
+    rotate = ROTATE_90 if orientation and orientation.lower() == 'landscape' else None
+    image = _fit_crop(image, target_width, target_height, rotate)
+
+    if NUMBA_AVAILABLE:
+        # Dither with the compiled kernel (only needs the 6 palette colors)
+        idx_array = dither_fs(np.asarray(image), PALETTE_6COLOR_ARR)
+    else:
+        # Quantize the image to the palette (dither helps with gradients)
+        assert image.mode == 'RGB'
+        indexed = image.quantize(palette=PAL_IMAGE_6COLOR, dither=Image.FLOYDSTEINBERG)
+        idx_array = np.array(indexed, dtype=np.uint8)
 
     # Map palette indices to Seeed_GFX e-paper 4-bit codes
     # Index: 0=White, 1=Black, 2=Yellow, 3=Red, 4=Blue, 5=Green
     index_to_code = np.array([0x0, 0xF, 0xB, 0x6, 0xD, 0x2], dtype=np.uint8)
 
     # Convert indexed image to mapped codes
-    idx_array = np.array(indexed, dtype=np.uint8)
     code_array = index_to_code[idx_array]
 
-    # Pack two 4-bit pixels into each byte (even pixel in high nibble)
-    flat = code_array.flatten()
-    buf = np.empty((flat.size + 1) // 2, dtype=np.uint8)
-    buf[:flat.size // 2] = (flat[0::2] << 4) | flat[1::2]
-
+    # Pack two 4-bit pixels into each byte (even pixel in high nibble).
     # If odd number of pixels (shouldn't happen), pad with white
-    if flat.size % 2:
-        buf[-1] = (flat[-1] << 4) | 0x0
-
-    return bytes(buf)
+    return _pack_nibbles(code_array.ravel(), 0x0)
 
 def generate_demonstration_images(input_image_path, output_dir="upload/temp"):
     """
@@ -269,12 +349,15 @@ def generate_demonstration_images(input_image_path, output_dir="upload/temp"):
     # Generate timestamp for unique filenames
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
+    # Images are collected as (path, image) and encoded in parallel at the end
+    saves = []
+    
     # Load the original image
     original_image = Image.open(input_image_path)
     
     # Save the original image
     original_path = os.path.join(output_dir, f"{timestamp}_1_original.jpg")
-    original_image.save(original_path)
+    saves.append((original_path, original_image))
     
     # Ensure RGB mode
     if original_image.mode != 'RGB':
@@ -285,96 +368,64 @@ def generate_demonstration_images(input_image_path, output_dir="upload/temp"):
     oriented_image = original_image
     
     if is_image_landscape:
-        try:
-            # For newer versions of PIL
-            from PIL.Image import Transpose
-            oriented_image = original_image.transpose(Transpose.ROTATE_270)
-        except (ImportError, AttributeError):
-            # For older versions of PIL
-            oriented_image = original_image.transpose(Image.ROTATE_270)
+        oriented_image = original_image.transpose(ROTATE_270)
         
         oriented_path = os.path.join(output_dir, f"{timestamp}_2_rotated.jpg")
-        oriented_image.save(oriented_path)
+        saves.append((oriented_path, oriented_image))
     
     # Target dimensions for the e-paper display
     target_width, target_height = 1200, 1600
     
     # Resize image to fill target dimensions
-    width_ratio = target_width / oriented_image.width
-    height_ratio = target_height / oriented_image.height
-    resize_ratio = max(width_ratio, height_ratio)
-    
-    new_width = int(oriented_image.width * resize_ratio)
-    new_height = int(oriented_image.height * resize_ratio)
-    
-    resized_image = oriented_image.resize((new_width, new_height), Image.LANCZOS)
+    resized_image = _resize_to_fill(oriented_image, target_width, target_height)
     resized_path = os.path.join(output_dir, f"{timestamp}_3_resized.jpg")
-    resized_image.save(resized_path)
+    saves.append((resized_path, resized_image))
     
     # Crop if needed
-    if new_width > target_width or new_height > target_height:
-        left = (new_width - target_width) // 2
-        top = (new_height - target_height) // 2
-        right = left + target_width
-        bottom = top + target_height
-        
-        cropped_image = resized_image.crop((left, top, right, bottom))
+    cropped_image = _center_crop(resized_image, target_width, target_height)
+    if cropped_image is not resized_image:
         cropped_path = os.path.join(output_dir, f"{timestamp}_4_cropped.jpg")
-        cropped_image.save(cropped_path)
+        saves.append((cropped_path, cropped_image))
     else:
         cropped_image = resized_image
         cropped_path = resized_path
     
-    # Create a palette image with the 7 colors used by the e-paper display
-    pal_image = Image.new('P', (1, 1))
-    # The palette order is: Black, White, Yellow, Red, Black(duplicate), Blue, Green
-    pal_image.putpalette((0,0,0, 255,255,255, 255,255,0, 255,0,0, 0,0,0, 0,0,255, 0,255,0) + (0,0,0)*249)
-    
-    # Convert the source image to the 7 colors
-    quantized_image = cropped_image.quantize(palette=pal_image)
+    # Convert the source image to the 7 colors used by the e-paper display
+    quantized_image = cropped_image.quantize(palette=PAL_IMAGE_7COLOR)
     quantized_path = os.path.join(output_dir, f"{timestamp}_5_quantized.jpg")
-    quantized_image.convert('RGB').save(quantized_path)
+    saves.append((quantized_path, quantized_image.convert('RGB')))
     
     # Create a visualization of the final byte array
-    buf_7color = bytearray(quantized_image.tobytes('raw'))
+    buf_7color = quantized_image.tobytes('raw')
     
     # This converts the byte array back to a viewable image to show what is sent to display
-    reconstructed = Image.new('P', (target_width, target_height))
-    reconstructed.putpalette((0,0,0, 255,255,255, 255,255,0, 255,0,0, 0,0,0, 0,0,255, 0,255,0) + (0,0,0)*249)
-    reconstructed.putdata(buf_7color)
+    reconstructed = Image.frombytes('P', quantized_image.size, buf_7color)
+    reconstructed.putpalette(PALETTE_7COLOR_DATA)
     
     final_path = os.path.join(output_dir, f"{timestamp}_6_final.jpg")
-    reconstructed.convert('RGB').save(final_path)
+    saves.append((final_path, reconstructed.convert('RGB')))
     
     # Also save a visualization of how the actual bytes would look
     # (unpacking the 4-bit values that would be packed in the actual data)
     final_bytes_path = os.path.join(output_dir, f"{timestamp}_7_byte_representation.jpg")
     
-    # Create an array to represent unpacked bytes
-    width = target_width
-    height = target_height
-    unpacked_data = []
-    
     # Simulate the packing/unpacking process
-    buf = bytearray(int(width * height / 2))
-    idx = 0
-    
-    for i in range(0, len(buf_7color), 2):
-        if i + 1 < len(buf_7color):
-            buf[idx] = (buf_7color[i] << 4) | buf_7color[i+1]
-            unpacked_data.append(buf_7color[i])
-            unpacked_data.append(buf_7color[i+1])
-        else:
-            buf[idx] = (buf_7color[i] << 4) | 1
-            unpacked_data.append(buf_7color[i])
-            unpacked_data.append(1)  # white padding
-        idx += 1
+    pixels = np.frombuffer(buf_7color, dtype=np.uint8)
+    buf = np.frombuffer(_pack_nibbles(pixels, 1), dtype=np.uint8)  # white padding
+    
+    unpacked_data = np.empty(buf.size * 2, dtype=np.uint8)
+    unpacked_data[0::2] = buf >> 4
+    unpacked_data[1::2] = buf & 0x0F
     
     # Create image from unpacked data
-    unpacked_image = Image.new('P', (width, height))
-    unpacked_image.putpalette((0,0,0, 255,255,255, 255,255,0, 255,0,0, 0,0,0, 0,0,255, 0,255,0) + (0,0,0)*249)
-    unpacked_image.putdata(unpacked_data)
-    unpacked_image.convert('RGB').save(final_bytes_path)
+    unpacked_image = Image.frombytes('P', quantized_image.size,
+                                     unpacked_data[:len(buf_7color)].tobytes())
+    unpacked_image.putpalette(PALETTE_7COLOR_DATA)
+    saves.append((final_bytes_path, unpacked_image.convert('RGB')))
+    
+    # JPEG encoding releases the GIL, so the saves run concurrently
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(lambda item: item[1].save(item[0], quality=85, optimize=False), saves))
     
     # Return paths to all generated images
     return [
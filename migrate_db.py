@@ -34,13 +34,8 @@ def migrate_db():
             conn.commit()
             print("Added event_log table to database")
             
-            # Add snap_to_hour column to photo_frame table
-            try:
-                conn.execute(text('ALTER TABLE photo_frame ADD COLUMN snap_to_hour BOOLEAN DEFAULT 0'))
-                conn.commit()
-                print("Added snap_to_hour column to photo_frame table")
-            except Exception:
-                pass  # Column already exists
+            # snap_to_hour is now a bit of photo_frame.flags; db_manager --migrate
+            # adds that column and carries over the old boolean values
 
 if __name__ == '__main__':
     migrate_db()
\ No newline at end of file
@@ -1,9 +1,12 @@
-from datetime import datetime, timedelta, timezone
-import pytz
+from datetime import datetime, timezone
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 import math
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import JSON
+from sqlalchemy import JSON, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.hybrid import hybrid_property
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,22 +14,95 @@ logger = logging.getLogger(__name__)
 # Create the SQLAlchemy instance
 db = SQLAlchemy()
 
+# Pool settings for the app engine; concurrent requests each get their own
+# connection and stale ones are replaced instead of failing the request
+ENGINE_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_timeout': 30,
+    'pool_pre_ping': True,
+    'pool_recycle': 1800,
+}
+
+# Applied to every new SQLite connection (app, db_manager and migration scripts):
+# WAL lets readers run alongside the writer, and with synchronous=NORMAL needs a
+# single fsync per checkpoint instead of two per commit
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Engine 'connect' hook that applies SQLITE_PRAGMAS to SQLite connections"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
 def init_db(app):
     """Initialize the database with the Flask app"""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    # In-memory SQLite uses a single static connection, which takes no pool options
+    if ':memory:' not in uri and uri not in ('sqlite://', 'sqlite:///'):
+        options = dict(ENGINE_OPTIONS)
+        if uri.startswith('sqlite'):
+            options['connect_args'] = {'check_same_thread': False, 'timeout': 30}
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', options)
     db.init_app(app)
 
-def is_in_deep_sleep(frame, current_time):
-    """Check if frame is in deep sleep based on UTC hours."""
-    if not frame.deep_sleep_enabled or frame.deep_sleep_start is None or frame.deep_sleep_end is None:
-        return False
-    
-    current_hour = current_time.hour
-    
+# get_status thresholds, in seconds
+_TWO_MIN = 120.0
+_FIVE_MIN = 300.0
+_TEN_MIN = 600.0
+
+def _utc_timestamp(dt):
+    """Epoch seconds for a datetime, treating naive values as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+@lru_cache(maxsize=1024)
+def deep_sleep_hours_mask(start, end):
+    """24-bit mask with bit h set for each UTC hour h inside the sleep window."""
     # Handle cases where sleep period crosses midnight
-    if frame.deep_sleep_start > frame.deep_sleep_end:
-        return current_hour >= frame.deep_sleep_start or current_hour < frame.deep_sleep_end
+    if start > end:
+        hours = list(range(start, 24)) + list(range(0, end))
     else:
-        return frame.deep_sleep_start <= current_hour < frame.deep_sleep_end
+        hours = range(start, end)
+    mask = 0
+    for hour in hours:
+        mask |= 1 << hour
+    return mask
+
+# Bits of PhotoFrame.flags; each boolean setting is one bit of a single column
+FRAME_FLAGS = {
+    'shuffle_enabled': 1 << 0,
+    'deep_sleep_enabled': 1 << 1,
+    'dynamic_playlist_active': 1 << 2,
+    'snap_to_hour': 1 << 3,
+}
+
+def _flag_property(name):
+    """Boolean attribute backed by one bit of the flags column, usable in queries too."""
+    bit = FRAME_FLAGS[name]
+
+    def fget(self):
+        return bool((self.flags or 0) & bit)
+
+    def fset(self, value):
+        flags = self.flags or 0
+        self.flags = flags | bit if value else flags & ~bit
+
+    def expr(cls):
+        return cls.flags.op('&')(bit) != 0
+
+    fget.__name__ = name
+    return hybrid_property(fget, fset, expr=expr)
 
 class Photo(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -42,7 +118,7 @@ class Photo(db.Model):
     duration = db.Column(db.Float)
     exif_metadata = db.Column(JSON)
 
-    playlist_entries = db.relationship('PlaylistEntry', backref='photo', lazy='dynamic')
+    playlist_entries = db.relationship('PlaylistEntry', backref='photo', lazy='select')
 
     def __repr__(self):
         return f"<Photo {self.id}: {self.filename}>"
@@ -59,9 +135,10 @@ class PhotoFrame(db.Model):
     last_diagnostic = db.Column(db.DateTime)
     current_photo_id = db.Column(db.Integer, db.ForeignKey('photo.id'))
     sync_group_id = db.Column(db.Integer, db.ForeignKey('sync_group.id'))
-    shuffle_enabled = db.Column(db.Boolean, default=False)
-    snap_to_hour = db.Column(db.Boolean, default=False)  # Align photo changes to clock hours when interval >= 60 min
-    deep_sleep_enabled = db.Column(db.Boolean, default=False)
+    flags = db.Column(db.Integer, default=0)  # Packed boolean settings, see FRAME_FLAGS
+    shuffle_enabled = _flag_property('shuffle_enabled')
+    snap_to_hour = _flag_property('snap_to_hour')  # Align photo changes to clock hours when interval >= 60 min
+    deep_sleep_enabled = _flag_property('deep_sleep_enabled')
     deep_sleep_start = db.Column(db.Integer) # Hour in UTC (0-23)
     deep_sleep_end = db.Column(db.Integer)   # Hour in UTC (0-23)
     frame_type = db.Column(db.String(20), default='physical') # 'physical' or 'virtual'
@@ -85,12 +162,12 @@ class PhotoFrame(db.Model):
 
     # Dynamic playlist fields
     dynamic_playlist_prompt = db.Column(db.Text)
-    dynamic_playlist_active = db.Column(db.Boolean, default=False)
+    dynamic_playlist_active = _flag_property('dynamic_playlist_active')
     dynamic_playlist_model = db.Column(db.String(100))
     dynamic_playlist_updated_at = db.Column(db.DateTime)
 
     # Overlay preferences
-    overlay_preferences = db.Column(db.Text, default='{"weather": false, "metadata": false, "qrcode": false}')
+    overlay_preferences = db.Column(JSON, default=lambda: {"weather": False, "metadata": False, "qrcode": False})
 
     # Playlist assignment - frames reference a playlist (N:1)
     playlist_id = db.Column(db.Integer, db.ForeignKey('playlist.id'), nullable=True)
@@ -98,12 +175,19 @@ class PhotoFrame(db.Model):
     # Relationships
     current_photo = db.relationship('Photo', foreign_keys=[current_photo_id])
     playlist = db.relationship('Playlist', back_populates='frames')
-    scheduled_generations = db.relationship('ScheduledGeneration', backref='frame', lazy='dynamic')
+    scheduled_generations = db.relationship('ScheduledGeneration', backref='frame', lazy='select')
 
     # Timestamps
     last_sync_time = db.Column(db.DateTime) # For sync group tracking
     diagnostics = db.Column(JSON)  # Add this line to store diagnostic data
 
+    @property
+    def deep_sleep_mask(self):
+        """Hours (as a bitmask) this frame sleeps through."""
+        if not self.deep_sleep_enabled or self.deep_sleep_start is None or self.deep_sleep_end is None:
+            return 0
+        return deep_sleep_hours_mask(self.deep_sleep_start, self.deep_sleep_end)
+
     @property
     def playlist_entries(self):
         """Backward-compatible property to get playlist entries via the assigned playlist."""
@@ -123,43 +207,40 @@ class PhotoFrame(db.Model):
         if not self.last_wake_time:
             return (0, "Never Connected", "#dc3545")  # Red
 
-        # Ensure times are timezone-aware in UTC
-        last_wake = self.last_wake_time.replace(tzinfo=pytz.UTC) if self.last_wake_time.tzinfo is None else self.last_wake_time.astimezone(pytz.UTC)
-        current_time = current_time.replace(tzinfo=pytz.UTC) if current_time.tzinfo is None else current_time.astimezone(pytz.UTC)
+        # Compare as UTC epoch seconds (naive datetimes in the DB are UTC)
+        now_ts = _utc_timestamp(current_time)
+        last_wake_ts = _utc_timestamp(self.last_wake_time)
 
-        # Check deep sleep first (uses UTC hours stored in DB)
-        if is_in_deep_sleep(self, current_time):
+        # Check deep sleep first (uses UTC hours stored in DB); the hour comes
+        # straight from the epoch value, and frames without deep sleep skip it
+        deep_sleep_mask = self.deep_sleep_mask
+        if deep_sleep_mask and (deep_sleep_mask >> (int(now_ts // 3600) % 24)) & 1:
              return (3, "In Deep Sleep", "#6f42c1") # Purple
 
-        # Calculate time since last wake
-        time_since_wake = current_time - last_wake
-
         # If device connected recently, it's online
-        if time_since_wake <= timedelta(minutes=5):
+        if now_ts - last_wake_ts <= _FIVE_MIN:
             return (2, "Online", "#28a745")  # Green
 
         # Check if we're in the expected wake window based on next_wake_time
         if self.next_wake_time:
-            next_wake = self.next_wake_time.replace(tzinfo=pytz.UTC) if self.next_wake_time.tzinfo is None else self.next_wake_time.astimezone(pytz.UTC)
-            wake_window_start = next_wake - timedelta(minutes=2)
-            wake_window_end = next_wake + timedelta(minutes=2)
+            next_wake_ts = _utc_timestamp(self.next_wake_time)
+            wake_window_end = next_wake_ts + _TWO_MIN
 
-            if wake_window_start <= current_time <= wake_window_end:
+            if next_wake_ts - _TWO_MIN <= now_ts <= wake_window_end:
                 return (1, "Sleeping", "#ffc107")  # Yellow
 
             # If we've missed the wake window significantly
-            if current_time > wake_window_end + timedelta(minutes=10):
+            if now_ts > wake_window_end + _TEN_MIN:
                 return (0, "Offline", "#dc3545")  # Red
 
         # Fallback check based on sleep_interval if next_wake_time is unreliable/missing
-        expected_wake_based_on_interval = last_wake + timedelta(minutes=self.sleep_interval)
-        wake_window_end_based_on_interval = expected_wake_based_on_interval + timedelta(minutes=2)
+        wake_window_end_based_on_interval = last_wake_ts + self.sleep_interval * 60 + _TWO_MIN
 
-        if current_time <= wake_window_end_based_on_interval:
+        if now_ts <= wake_window_end_based_on_interval:
              return (1, "Sleeping", "#ffc107") # Yellow
 
         # If significantly past the expected interval-based wake time
-        if current_time > wake_window_end_based_on_interval + timedelta(minutes=10):
+        if now_ts > wake_window_end_based_on_interval + _TEN_MIN:
             return (0, "Offline", "#dc3545") # Red
 
         # Default to sleeping if none of the above conditions met strongly
@@ -245,20 +326,22 @@ class SyncGroup(db.Model):
         now_utc = datetime.now(timezone.utc)
         base_time = after if after else now_utc
         if base_time.tzinfo is None: # Ensure base_time is timezone-aware UTC
-             base_time = pytz.UTC.localize(base_time)
+             base_time = base_time.replace(tzinfo=timezone.utc)
         else:
-             base_time = base_time.astimezone(pytz.UTC)
+             base_time = base_time.astimezone(timezone.utc)
 
-        interval_seconds = self.sleep_interval * 60
-        epoch_seconds = base_time.timestamp()
+        # Whole seconds throughout; a fractional base rounds up so the result never precedes it
+        interval_seconds = max(1, int(round(self.sleep_interval * 60)))
+        epoch_seconds = math.ceil(base_time.timestamp())
 
-        # Find the next interval boundary from UTC epoch
-        next_boundary_seconds = math.ceil(epoch_seconds / interval_seconds) * interval_seconds
+        # Find the next interval boundary from UTC epoch (integer ceil-division)
+        next_boundary_seconds = -(-epoch_seconds // interval_seconds) * interval_seconds
 
         # Convert back to naive UTC datetime for database/comparison consistency
         next_sync_naive_utc = datetime.fromtimestamp(next_boundary_seconds, tz=timezone.utc).replace(tzinfo=None)
 
-        logger.debug(f"Group {self.id} sync calc: Base={base_time.isoformat()}, Interval={self.sleep_interval}m, NextSync={next_sync_naive_utc.isoformat()}Z")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Group {self.id} sync calc: Base={base_time.isoformat()}, Interval={self.sleep_interval}m, NextSync={next_sync_naive_utc.isoformat()}Z")
         return next_sync_naive_utc 
 
 class EventLog(db.Model):
@@ -269,6 +352,11 @@ class EventLog(db.Model):
     source = db.Column(db.String(50), nullable=False)  # user, mqtt, system, frame, etc.
     details = db.Column(JSON)  # Store additional event-specific information
     
+    # Supports keyset pagination in EventLogger.get_events
+    __table_args__ = (
+        db.Index('ix_eventlog_ts_id', timestamp.desc(), id.desc()),
+    )
+    
     # Relationship with PhotoFrame
     frame = db.relationship('PhotoFrame', backref=db.backref('events', lazy='dynamic'))
     
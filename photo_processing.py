@@ -213,8 +213,9 @@ class PhotoProcessor:
                 new_width = target_width
                 new_height = int(new_width / img_ratio)
             
-            # Resize the image
-            resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            # Resize the image (reducing_gap pre-shrinks large originals with a
+            # cheap box reduce before the LANCZOS pass)
+            resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=3.0)
             
             # Generate output filename
             filename = os.path.basename(image_path)
@@ -358,8 +359,8 @@ class PhotoProcessor:
             resize_width = max(1, resize_width)
             resize_height = max(1, resize_height)
             
-            # Resize original image
-            img = img.resize((resize_width, resize_height), Image.LANCZOS)
+            # Resize original image (box-reduce first for large downscales)
+            img = img.resize((resize_width, resize_height), Image.LANCZOS, reducing_gap=3.0)
             
             # Convert to RGB if necessary and save as JPEG
             if img.mode != 'RGB':
@@ -14,6 +14,7 @@ Run this script AFTER updating model.py but BEFORE restarting the server.
 import os
 import sys
 import logging
+import sqlite3
 from datetime import datetime
 
 # Add parent directory to path for imports
@@ -21,6 +22,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from flask import Flask
 from sqlalchemy import text, inspect
+from sqlalchemy.exc import OperationalError
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +30,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Temporary indexes on the legacy playlist_entry columns used by the migration
+MIGRATION_INDEXES = (
+    ('idx_pe_frame_id', 'frame_id'),
+    ('idx_pe_custom_playlist_id', 'custom_playlist_id'),
+)
+
 
 def get_app():
     """Create Flask app instance for database operations."""
@@ -40,19 +48,98 @@ def get_app():
     return app
 
 
-def column_exists(conn, table_name, column_name):
-    """Check if a column exists in a table."""
-    result = conn.execute(text(f"PRAGMA table_info({table_name})"))
-    columns = [row[1] for row in result.fetchall()]
-    return column_name in columns
+def load_schema(conn):
+    """Return the set of table names and a {table: set(columns)} map in one pass."""
+    tables = {row[0] for row in conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type='table'"
+    ))}
+    columns = {
+        table: {row[1] for row in conn.execute(text(f'PRAGMA table_info("{table}")'))}
+        for table in tables
+    }
+    return tables, columns
+
+
+def rebuild_table_without(conn, table_name, column_names):
+    """Recreate a table without some columns (SQLite's create/copy/drop/rename procedure)."""
+    dropped = set(column_names)
+    columns = [
+        row for row in conn.execute(text(f'PRAGMA table_info("{table_name}")'))
+        if row[1] not in dropped
+    ]
+    kept = ", ".join(f'"{row[1]}"' for row in columns)
+
+    definitions = []
+    for _, name, column_type, notnull, default, _ in columns:
+        definition = f'"{name}" {column_type}'.rstrip()
+        if notnull:
+            definition += " NOT NULL"
+        if default is not None:
+            definition += f" DEFAULT {default}"
+        definitions.append(definition)
+
+    primary_key = [row[1] for row in sorted(columns, key=lambda row: row[5]) if row[5]]
+    if primary_key:
+        definitions.append("PRIMARY KEY ({})".format(", ".join(f'"{name}"' for name in primary_key)))
 
+    # Table-level UNIQUE constraints show up as automatic indexes
+    for _, index_name, _, origin, _ in conn.execute(text(f'PRAGMA index_list("{table_name}")')):
+        if origin != 'u':
+            continue
+        index_columns = [row[2] for row in conn.execute(text(f'PRAGMA index_info("{index_name}")'))]
+        if not dropped.intersection(index_columns):
+            definitions.append("UNIQUE ({})".format(", ".join(f'"{name}"' for name in index_columns)))
 
-def table_exists(conn, table_name):
-    """Check if a table exists."""
-    result = conn.execute(text(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name=:name"
-    ), {"name": table_name})
-    return result.fetchone() is not None
+    # Foreign keys come back one row per column, grouped by constraint id
+    foreign_keys = {}
+    for fk_id, _, ref_table, from_column, to_column, on_update, on_delete, _ in conn.execute(
+        text(f'PRAGMA foreign_key_list("{table_name}")')
+    ):
+        foreign_keys.setdefault(fk_id, (ref_table, on_update, on_delete, []))[3].append((from_column, to_column))
+    for ref_table, on_update, on_delete, pairs in foreign_keys.values():
+        if dropped.intersection(from_column for from_column, _ in pairs):
+            continue
+        definition = "FOREIGN KEY ({}) REFERENCES \"{}\"".format(
+            ", ".join(f'"{from_column}"' for from_column, _ in pairs), ref_table
+        )
+        if all(to_column for _, to_column in pairs):
+            definition += " ({})".format(", ".join(f'"{to_column}"' for _, to_column in pairs))
+        if on_update != 'NO ACTION':
+            definition += f" ON UPDATE {on_update}"
+        if on_delete != 'NO ACTION':
+            definition += f" ON DELETE {on_delete}"
+        definitions.append(definition)
+
+    # Explicit indexes are recreated afterwards unless they cover a dropped column
+    indexes = []
+    for index_name, index_sql in conn.execute(text(
+        "SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=:name AND sql IS NOT NULL"
+    ), {"name": table_name}).fetchall():
+        index_columns = {row[2] for row in conn.execute(text(f'PRAGMA index_info("{index_name}")'))}
+        if not dropped.intersection(index_columns):
+            indexes.append(index_sql)
+
+    new_table = f"{table_name}__new"
+    conn.execute(text('CREATE TABLE "{}" (\n    {}\n)'.format(new_table, ",\n    ".join(definitions))))
+    conn.execute(text(f'INSERT INTO "{new_table}" ({kept}) SELECT {kept} FROM "{table_name}"'))
+    conn.execute(text(f'DROP TABLE "{table_name}"'))
+    conn.execute(text(f'ALTER TABLE "{new_table}" RENAME TO "{table_name}"'))
+    for index_sql in indexes:
+        conn.execute(text(index_sql))
+
+
+def drop_columns(conn, table_name, column_names):
+    """Drop columns, falling back to a table rebuild where ALTER TABLE can't do it."""
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        try:
+            for column in column_names:
+                conn.execute(text(f'ALTER TABLE "{table_name}" DROP COLUMN "{column}"'))
+            return
+        except OperationalError as e:
+            # e.g. the column is part of a table-level FOREIGN KEY or an index;
+            # the failed statement changes nothing, so rebuild from here
+            logger.info("Cannot drop columns from %s in place (%s), rebuilding the table", table_name, e.orig)
+    rebuild_table_without(conn, table_name, column_names)
 
 
 def migrate_db():
@@ -63,171 +150,223 @@ def migrate_db():
     init_db(app)
     
     with app.app_context():
-        with db.engine.connect() as conn:
-            logger.info("Starting playlist structure migration...")
+        # pysqlite only opens a transaction before DML, so the renames, ADD
+        # COLUMNs and indexes would autocommit. Turn its implicit transaction
+        # handling off and issue BEGIN ourselves so the whole migration, DDL
+        # included, is one transaction (one commit/fsync). WAL and the other
+        # connection PRAGMAs are set by model's connect hook.
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            with conn.begin():
+                conn.exec_driver_sql("BEGIN")
+                logger.info("Starting playlist structure migration...")
+                tables, columns = load_schema(conn)
+                frame_columns = columns.get('photo_frame', set())
+                entry_columns = columns.get('playlist_entry', set())
             
-            # Step 1: Check if we need to rename custom_playlist to playlist
-            custom_playlist_exists = table_exists(conn, 'custom_playlist')
-            playlist_exists = table_exists(conn, 'playlist')
+                # Step 1: Check if we need to rename custom_playlist to playlist
+                custom_playlist_exists = 'custom_playlist' in tables
+                playlist_exists = 'playlist' in tables
             
-            if custom_playlist_exists and not playlist_exists:
-                logger.info("Renaming custom_playlist table to playlist...")
-                conn.execute(text("ALTER TABLE custom_playlist RENAME TO playlist"))
-                conn.commit()
-                logger.info("Renamed custom_playlist to playlist")
-            elif not playlist_exists:
-                logger.info("Creating playlist table...")
-                conn.execute(text('''
-                    CREATE TABLE playlist (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name VARCHAR(256) NOT NULL UNIQUE,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                '''))
-                conn.commit()
-                logger.info("Created playlist table")
+                if custom_playlist_exists and not playlist_exists:
+                    logger.info("Renaming custom_playlist table to playlist...")
+                    conn.execute(text("ALTER TABLE custom_playlist RENAME TO playlist"))
+                    logger.info("Renamed custom_playlist to playlist")
+                elif not playlist_exists:
+                    logger.info("Creating playlist table...")
+                    conn.execute(text('''
+                        CREATE TABLE playlist (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            name VARCHAR(256) NOT NULL UNIQUE,
+                            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                        )
+                    '''))
+                    logger.info("Created playlist table")
             
-            # Step 2: Add playlist_id to photo_frame if it doesn't exist
-            if not column_exists(conn, 'photo_frame', 'playlist_id'):
-                logger.info("Adding playlist_id column to photo_frame...")
-                conn.execute(text(
-                    "ALTER TABLE photo_frame ADD COLUMN playlist_id INTEGER REFERENCES playlist(id)"
-                ))
-                conn.commit()
-                logger.info("Added playlist_id to photo_frame")
+                # Step 2: Add playlist_id to photo_frame if it doesn't exist
+                if 'playlist_id' not in frame_columns:
+                    logger.info("Adding playlist_id column to photo_frame...")
+                    conn.execute(text(
+                        "ALTER TABLE photo_frame ADD COLUMN playlist_id INTEGER REFERENCES playlist(id)"
+                    ))
+                    logger.info("Added playlist_id to photo_frame")
             
-            # Step 3: Add playlist_id to playlist_entry if it doesn't exist
-            if not column_exists(conn, 'playlist_entry', 'playlist_id'):
-                logger.info("Adding playlist_id column to playlist_entry...")
-                conn.execute(text(
-                    "ALTER TABLE playlist_entry ADD COLUMN playlist_id INTEGER REFERENCES playlist(id)"
-                ))
-                conn.commit()
-                logger.info("Added playlist_id to playlist_entry")
+                # Step 3: Add playlist_id to playlist_entry if it doesn't exist
+                if 'playlist_id' not in entry_columns:
+                    logger.info("Adding playlist_id column to playlist_entry...")
+                    conn.execute(text(
+                        "ALTER TABLE playlist_entry ADD COLUMN playlist_id INTEGER REFERENCES playlist(id)"
+                    ))
+                    logger.info("Added playlist_id to playlist_entry")
             
-            # Step 4: Migrate custom_playlist_id references to playlist_id in playlist_entry
-            if column_exists(conn, 'playlist_entry', 'custom_playlist_id'):
-                logger.info("Migrating custom_playlist_id to playlist_id in playlist_entry...")
-                conn.execute(text('''
-                    UPDATE playlist_entry 
-                    SET playlist_id = custom_playlist_id 
-                    WHERE custom_playlist_id IS NOT NULL AND playlist_id IS NULL
-                '''))
-                conn.commit()
-                logger.info("Migrated custom_playlist_id references")
+                # Index the legacy columns the steps below filter and join on; these
+                # are dropped again at the end since the columns are no longer used
+                migration_indexes = [
+                    (name, column) for name, column in MIGRATION_INDEXES if column in entry_columns
+                ]
+                for name, column in migration_indexes:
+                    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON playlist_entry({column})"))
             
-            # Step 5: Migrate frame playlists to the new structure
-            # For each frame that has entries with frame_id set, create a playlist
-            if column_exists(conn, 'playlist_entry', 'frame_id'):
-                logger.info("Migrating frame-based playlists...")
-                
-                # Get all frames that have playlist entries with frame_id set
-                result = conn.execute(text('''
-                    SELECT DISTINCT pf.id, pf.name 
-                    FROM photo_frame pf
-                    INNER JOIN playlist_entry pe ON pe.frame_id = pf.id
-                    WHERE pf.playlist_id IS NULL
-                '''))
-                frames_with_entries = result.fetchall()
-                
-                for frame_id, frame_name in frames_with_entries:
-                    playlist_name = f"{frame_name or frame_id} Playlist"
-                    
-                    # Check if playlist with this name already exists
-                    existing = conn.execute(text(
-                        "SELECT id FROM playlist WHERE name = :name"
-                    ), {"name": playlist_name}).fetchone()
-                    
-                    if existing:
-                        playlist_id = existing[0]
-                        logger.info(f"Using existing playlist '{playlist_name}' (id={playlist_id}) for frame {frame_id}")
-                    else:
-                        # Create new playlist for this frame
-                        conn.execute(text('''
-                            INSERT INTO playlist (name, created_at, updated_at)
-                            VALUES (:name, :now, :now)
-                        '''), {"name": playlist_name, "now": datetime.utcnow()})
-                        conn.commit()
-                        
-                        # Get the new playlist ID
-                        result = conn.execute(text(
-                            "SELECT id FROM playlist WHERE name = :name"
-                        ), {"name": playlist_name})
-                        playlist_id = result.fetchone()[0]
-                        logger.info(f"Created playlist '{playlist_name}' (id={playlist_id}) for frame {frame_id}")
-                    
-                    # Update frame to reference this playlist
-                    conn.execute(text('''
-                        UPDATE photo_frame SET playlist_id = :playlist_id WHERE id = :frame_id
-                    '''), {"playlist_id": playlist_id, "frame_id": frame_id})
-                    
-                    # Update playlist entries to reference the playlist instead of frame
+                # Step 4: Migrate custom_playlist_id references to playlist_id in playlist_entry
+                if 'custom_playlist_id' in entry_columns:
+                    logger.info("Migrating custom_playlist_id to playlist_id in playlist_entry...")
                     conn.execute(text('''
                         UPDATE playlist_entry 
-                        SET playlist_id = :playlist_id, frame_id = NULL
-                        WHERE frame_id = :frame_id
-                    '''), {"playlist_id": playlist_id, "frame_id": frame_id})
-                    
-                    conn.commit()
-                    logger.info(f"Migrated playlist entries for frame {frame_id}")
+                        SET playlist_id = custom_playlist_id 
+                        WHERE custom_playlist_id IS NOT NULL AND playlist_id IS NULL
+                    '''))
+                    logger.info("Migrated custom_playlist_id references")
+            
+                # Step 5: Migrate frame playlists to the new structure
+                # For each frame that has entries with frame_id set, create a playlist
+                if 'frame_id' in entry_columns:
+                    logger.info("Migrating frame-based playlists...")
                 
-                # Step 6: Create empty playlists for frames without entries
-                logger.info("Creating playlists for frames without entries...")
-                result = conn.execute(text('''
-                    SELECT id, name FROM photo_frame WHERE playlist_id IS NULL
-                '''))
-                frames_without_playlist = result.fetchall()
+                    now = datetime.utcnow()
+                
+                    # Create one playlist per distinct frame name in a single statement,
+                    # skipping names that already have a playlist so those get reused
+                    result = conn.execute(text('''
+                        INSERT INTO playlist (name, created_at, updated_at)
+                        SELECT DISTINCT COALESCE(NULLIF(pf.name, ''), pf.id) || ' Playlist', :now, :now
+                        FROM photo_frame pf
+                        WHERE pf.playlist_id IS NULL
+                          AND pf.id IN (SELECT DISTINCT frame_id FROM playlist_entry WHERE frame_id IS NOT NULL)
+                          AND NOT EXISTS (
+                              SELECT 1 FROM playlist p
+                              WHERE p.name = COALESCE(NULLIF(pf.name, ''), pf.id) || ' Playlist'
+                          )
+                    '''), {"now": now})
+                    logger.info("Created %d playlists for frames with entries", result.rowcount)
+                
+                    # Point every frame with entries at its playlist by name
+                    result = conn.execute(text('''
+                        UPDATE photo_frame SET playlist_id = (
+                            SELECT p.id FROM playlist p
+                            WHERE p.name = COALESCE(NULLIF(photo_frame.name, ''), photo_frame.id) || ' Playlist'
+                        )
+                        WHERE playlist_id IS NULL
+                          AND id IN (SELECT DISTINCT frame_id FROM playlist_entry WHERE frame_id IS NOT NULL)
+                    '''))
+                    logger.info("Assigned playlists to %d frames", result.rowcount)
+                
+                    # Move entries onto their frame's playlist; entries pointing at
+                    # frames that no longer exist are left alone
+                    result = conn.execute(text('''
+                        UPDATE playlist_entry SET playlist_id = (
+                            SELECT pf.playlist_id FROM photo_frame pf
+                            WHERE pf.id = playlist_entry.frame_id
+                        ), frame_id = NULL
+                        WHERE frame_id IN (SELECT id FROM photo_frame WHERE playlist_id IS NOT NULL)
+                    '''))
+                    logger.info("Migrated %d playlist entries", result.rowcount)
                 
-                for frame_id, frame_name in frames_without_playlist:
-                    playlist_name = f"{frame_name or frame_id} Playlist"
-                    
-                    # Handle duplicate names by adding suffix
-                    base_name = playlist_name
-                    counter = 1
-                    while True:
-                        existing = conn.execute(text(
-                            "SELECT id FROM playlist WHERE name = :name"
-                        ), {"name": playlist_name}).fetchone()
-                        if not existing:
-                            break
-                        counter += 1
-                        playlist_name = f"{base_name} ({counter})"
-                    
-                    # Create playlist
+                    # Step 6: Create empty playlists for frames without entries
+                    logger.info("Creating playlists for frames without entries...")
+                
+                    # Work out every frame's playlist name in one statement. Frames sharing
+                    # a base name take, in frame order, the free names from the sequence
+                    # "<base>", "<base> (2)", "<base> (3)", ...; walking base count plus
+                    # existing names in that family guarantees enough free ones.
+                    conn.execute(text('''
+                        CREATE TEMP TABLE new_frame_playlist AS
+                        WITH RECURSIVE
+                        pending AS (
+                            SELECT id AS frame_id, rowid AS frame_order,
+                                   COALESCE(NULLIF(name, ''), id) || ' Playlist' AS base
+                            FROM photo_frame
+                            WHERE playlist_id IS NULL
+                        ),
+                        ranked AS (
+                            SELECT frame_id, frame_order, base,
+                                   ROW_NUMBER() OVER (PARTITION BY base ORDER BY frame_order) AS slot
+                            FROM pending
+                        ),
+                        bases AS (
+                            SELECT base, COUNT(*) + (
+                                SELECT COUNT(*) FROM playlist p
+                                WHERE p.name = pending.base
+                                   OR substr(p.name, 1, length(pending.base) + 2) = pending.base || ' ('
+                            ) AS max_suffix
+                            FROM pending
+                            GROUP BY base
+                        ),
+                        candidates(base, suffix, max_suffix) AS (
+                            SELECT base, 1, max_suffix FROM bases
+                            UNION ALL
+                            SELECT base, suffix + 1, max_suffix FROM candidates WHERE suffix < max_suffix
+                        ),
+                        free_names AS (
+                            SELECT base, name, ROW_NUMBER() OVER (PARTITION BY base ORDER BY suffix) AS slot
+                            FROM (
+                                SELECT base, suffix,
+                                       CASE suffix WHEN 1 THEN base ELSE base || ' (' || suffix || ')' END AS name
+                                FROM candidates
+                            )
+                            WHERE name NOT IN (SELECT name FROM playlist)
+                        )
+                        SELECT r.frame_id, r.frame_order, f.name
+                        FROM ranked r
+                        JOIN free_names f ON f.base = r.base AND f.slot = r.slot
+                    '''))
+                
+                    # Create the playlists in frame order, then point each frame at its own
                     conn.execute(text('''
                         INSERT INTO playlist (name, created_at, updated_at)
-                        VALUES (:name, :now, :now)
-                    '''), {"name": playlist_name, "now": datetime.utcnow()})
-                    conn.commit()
-                    
-                    # Get playlist ID
-                    result = conn.execute(text(
-                        "SELECT id FROM playlist WHERE name = :name"
-                    ), {"name": playlist_name})
-                    playlist_id = result.fetchone()[0]
-                    
-                    # Update frame
+                        SELECT name, :now, :now FROM new_frame_playlist ORDER BY frame_order
+                    '''), {"now": datetime.utcnow()})
                     conn.execute(text('''
-                        UPDATE photo_frame SET playlist_id = :playlist_id WHERE id = :frame_id
-                    '''), {"playlist_id": playlist_id, "frame_id": frame_id})
-                    conn.commit()
-                    
-                    logger.info(f"Created empty playlist '{playlist_name}' for frame {frame_id}")
+                        UPDATE photo_frame SET playlist_id = (
+                            SELECT p.id FROM playlist p
+                            JOIN new_frame_playlist n ON n.name = p.name
+                            WHERE n.frame_id = photo_frame.id
+                        )
+                        WHERE id IN (SELECT frame_id FROM new_frame_playlist)
+                    '''))
+                
+                    if logger.isEnabledFor(logging.INFO):
+                        for frame_id, name in conn.execute(text(
+                            "SELECT frame_id, name FROM new_frame_playlist ORDER BY frame_order"
+                        )):
+                            logger.info("Created empty playlist '%s' for frame %s", name, frame_id)
+                    conn.execute(text("DROP TABLE new_frame_playlist"))
             
-            logger.info("Migration completed successfully!")
+                for name, _ in migration_indexes:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
             
-            # Print summary
-            result = conn.execute(text("SELECT COUNT(*) FROM playlist"))
-            playlist_count = result.fetchone()[0]
+                # Step 7: Drop the legacy playlist_entry columns once no row still needs them
+                legacy_columns = []
+                for column, pending_sql in (
+                    ('custom_playlist_id', "custom_playlist_id IS NOT NULL AND playlist_id IS NULL"),
+                    ('frame_id', "frame_id IS NOT NULL"),
+                ):
+                    if column not in entry_columns:
+                        continue
+                    pending = conn.execute(text(
+                        f"SELECT EXISTS (SELECT 1 FROM playlist_entry WHERE {pending_sql})"
+                    )).scalar()
+                    if pending:
+                        logger.warning("Keeping playlist_entry.%s: some entries were not migrated", column)
+                    else:
+                        legacy_columns.append(column)
+                if legacy_columns:
+                    logger.info("Dropping legacy columns from playlist_entry: %s", ", ".join(legacy_columns))
+                    drop_columns(conn, 'playlist_entry', legacy_columns)
             
-            result = conn.execute(text("SELECT COUNT(*) FROM photo_frame"))
-            frame_count = result.fetchone()[0]
+                logger.info("Migration completed successfully!")
             
-            result = conn.execute(text("SELECT COUNT(*) FROM photo_frame WHERE playlist_id IS NOT NULL"))
-            frames_with_playlist = result.fetchone()[0]
+                # Print summary
+                result = conn.execute(text("SELECT COUNT(*) FROM playlist"))
+                playlist_count = result.fetchone()[0]
             
-            logger.info(f"Summary: {playlist_count} playlists, {frame_count} frames, {frames_with_playlist} frames with playlists")
+                result = conn.execute(text("SELECT COUNT(*) FROM photo_frame"))
+                frame_count = result.fetchone()[0]
+            
+                result = conn.execute(text("SELECT COUNT(*) FROM photo_frame WHERE playlist_id IS NOT NULL"))
+                frames_with_playlist = result.fetchone()[0]
+            
+                logger.info("Summary: %d playlists, %d frames, %d frames with playlists",
+                            playlist_count, frame_count, frames_with_playlist)
 
 
 def verify_migration():
@@ -241,28 +380,36 @@ def verify_migration():
         with db.engine.connect() as conn:
             logger.info("Verifying migration...")
             
-            # Check all frames have playlists
-            result = conn.execute(text('''
-                SELECT id FROM photo_frame WHERE playlist_id IS NULL
-            '''))
-            frames_without_playlist = result.fetchall()
+            # One round trip answers both checks; EXISTS stops at the first hit
+            _, columns = load_schema(conn)
+            has_frame_id = 'frame_id' in columns.get('playlist_entry', set())
+            missing_frames, entries_with_frame_id = conn.execute(text('''
+                SELECT
+                    EXISTS (SELECT 1 FROM photo_frame WHERE playlist_id IS NULL),
+                    {}
+            '''.format(
+                "EXISTS (SELECT 1 FROM playlist_entry WHERE frame_id IS NOT NULL)" if has_frame_id else "0"
+            ))).one()
             
-            if frames_without_playlist:
-                logger.warning(f"Found {len(frames_without_playlist)} frames without playlists!")
-                for (frame_id,) in frames_without_playlist:
-                    logger.warning(f"  - Frame: {frame_id}")
+            # Check all frames have playlists
+            if missing_frames:
+                result = conn.execute(text('''
+                    SELECT id FROM photo_frame WHERE playlist_id IS NULL
+                '''))
+                missing = 0
+                for (frame_id,) in result:
+                    missing += 1
+                    logger.warning("  - Frame without playlist: %s", frame_id)
+                logger.warning("Found %d frames without playlists!", missing)
                 return False
             
             # Check no playlist entries still reference frame_id
-            if column_exists(conn, 'playlist_entry', 'frame_id'):
-                result = conn.execute(text('''
+            if entries_with_frame_id:
+                count = conn.execute(text('''
                     SELECT COUNT(*) FROM playlist_entry WHERE frame_id IS NOT NULL
-                '''))
-                entries_with_frame_id = result.fetchone()[0]
-                
-                if entries_with_frame_id > 0:
-                    logger.warning(f"Found {entries_with_frame_id} playlist entries still referencing frame_id!")
-                    return False
+                ''')).scalar()
+                logger.warning("Found %d playlist entries still referencing frame_id!", count)
+                return False
             
             logger.info("Migration verification passed!")
             return True
@@ -29,6 +29,7 @@ from flask import (Flask, request, jsonify, send_from_directory,
                    redirect, url_for, render_template_string, flash, render_template, send_file, Response, session)
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import text
+from sqlalchemy.orm import joinedload
 from sqlalchemy.types import JSON
 from werkzeug.utils import secure_filename
 from PIL import Image, ImageDraw, ExifTags, ImageEnhance, ImageOps
@@ -373,7 +374,9 @@ atexit.register(cleanup_app_services)
 
 @app.template_filter('from_json')
 def from_json_filter(value):
-    """Template filter to parse JSON strings."""
+    """Template filter to parse JSON strings (already-parsed values pass through)."""
+    if isinstance(value, dict):
+        return value
     try:
         return json.loads(value) if value else {}
     except Exception:
@@ -1908,15 +1911,16 @@ def edit_frame_settings(frame_id):
         
         # Handle overlay preferences
         try:
-            preferences = json.loads(frame.overlay_preferences) if frame.overlay_preferences else {}
+            # Assign a new dict so the JSON column sees the change
+            preferences = dict(frame.overlay_preferences or {})
             preferences['weather'] = request.form.get('weather_overlay') == 'on'
             preferences['metadata'] = request.form.get('metadata_overlay') == 'on'
             preferences['qrcode'] = request.form.get('qrcode_overlay') == 'on'
-            frame.overlay_preferences = json.dumps(preferences)
+            frame.overlay_preferences = preferences
         except Exception as e:
             app.logger.error(f"Error updating overlay preferences: {e}")
             preferences = {'weather': False, 'metadata': False, 'qrcode': False}
-            frame.overlay_preferences = json.dumps(preferences)
+            frame.overlay_preferences = preferences
         
         db.session.commit()
         flash('Settings updated successfully.')
@@ -2035,12 +2039,7 @@ def get_settings():
         sleep_reason += " (adjusted to minimum)"
     
     # Get overlay preferences
-    overlay_prefs = {}
-    if frame.overlay_preferences:
-        try:
-            overlay_prefs = json.loads(frame.overlay_preferences)
-        except:
-            overlay_prefs = {}
+    overlay_prefs = frame.overlay_preferences or {}
     
     # Get image settings
     image_settings = {
@@ -2601,7 +2600,7 @@ def apply_enhancements(img, frame):
 
 def apply_overlays(temp_path, frame, photo):
     """Apply configured overlays to image."""
-    overlay_prefs = json.loads(frame.overlay_preferences) if frame.overlay_preferences else {}
+    overlay_prefs = frame.overlay_preferences or {}
     return overlay_manager.apply_overlays(temp_path, overlay_prefs, frame, photo)
 
 def generate_final_output(image_path, frame, output_type):
@@ -3680,7 +3679,7 @@ def test_overlay(frame_id):
             temp_path = create_temp_image(enhanced_img)
         
         # Apply overlays using the existing overlay manager
-        overlay_prefs = json.loads(use_frame.overlay_preferences) if use_frame.overlay_preferences else {}
+        overlay_prefs = use_frame.overlay_preferences or {}
         final_img = overlay_manager.apply_overlays(
             image_path=temp_path,
             preferences=overlay_prefs,
@@ -3712,11 +3711,11 @@ def handle_preview_settings(frame, args):
         preview_frame.saturation = int(args.get('saturation', 100))
         preview_frame.blue_adjustment = int(args.get('blue_adjustment', 0))
         preview_frame.padding = int(args.get('padding', 0))
-        preview_frame.overlay_preferences = json.dumps({
+        preview_frame.overlay_preferences = {
             'weather': args.get('weather', '').lower() == 'true',
             'metadata': args.get('metadata', '').lower() == 'true',
             'qrcode': args.get('qrcode', '').lower() == 'true'
-        })
+        }
         return preview_frame
     return frame
 
@@ -3738,11 +3737,12 @@ def list_frames():
     """Get a simple list of frames for dropdowns."""
     try:
         frames = PhotoFrame.query.order_by(PhotoFrame.order, PhotoFrame.name).all()
+        now = datetime.now(timezone.utc)
         frame_list = [{
             'id': frame.id,
             'name': frame.name,
             'type': frame.frame_type,  # Might be useful to show virtual vs physical frames
-            'status': frame.get_status()[0]  # 0=offline, 1=sleeping, 2=online
+            'status': frame.get_status(now)[0]  # 0=offline, 1=sleeping, 2=online
         } for frame in frames]
         
         return jsonify({'frames': frame_list})
@@ -4296,7 +4296,7 @@ def import_frame_settings(frame_id):
         # Copy settings
         target_frame.sleep_interval = source_frame.sleep_interval
         target_frame.orientation = source_frame.orientation
-        target_frame.overlay_preferences = source_frame.overlay_preferences
+        target_frame.overlay_preferences = dict(source_frame.overlay_preferences or {})
         
         # Copy image settings
         if hasattr(source_frame, 'contrast_factor'):
@@ -6310,8 +6310,9 @@ def edit_custom_playlist(playlist_id):
     """Page for editing a playlist."""
     playlist = Playlist.query.get_or_404(playlist_id)
     
-    # Get photos in playlist order
-    playlist_photos = [entry.photo for entry in playlist.entries.order_by(PlaylistEntry.order).all() if entry.photo]
+    # Get photos in playlist order, loading them with the entries in one query
+    entries = playlist.entries.options(joinedload(PlaylistEntry.photo)).order_by(PlaylistEntry.order).all()
+    playlist_photos = [entry.photo for entry in entries if entry.photo]
     
     # Get photos not in playlist
     playlist_photo_ids = [photo.id for photo in playlist_photos]